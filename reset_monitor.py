@@ -4,17 +4,31 @@ API Reset Time Monitor
 Monitors an API endpoint for reset times and sends email notifications when resets occur.
 """
 
+import atexit
+import ctypes
+import gc
+import hashlib
 import requests
 import smtplib
 import time
 import json
 import logging
 import os
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from datetime import datetime, timezone
-from typing import Dict, Optional
+import random
+import select
+import signal
+import socket
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from email.message import EmailMessage
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Load environment variables from .env file if it exists
 try:
@@ -23,6 +37,23 @@ try:
 except ImportError:
     pass  # python-dotenv not installed, will use system env vars
 
+# Use the ciso8601 C parser for timestamps if it's available
+try:
+    from ciso8601 import parse_datetime
+except ImportError:
+    parse_datetime = datetime.fromisoformat
+
+# Use orjson for JSON (de)serialization if it's available
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
 # ==================== CONFIGURATION ====================
 # Load from environment variables
 API_URL = os.getenv('API_URL')
@@ -45,6 +76,13 @@ SLACK_USER_ID = os.getenv('SLACK_USER_ID')  # U01234567
 # Monitoring settings
 SLEEP_BUFFER = int(os.getenv('SLEEP_BUFFER', '5'))  # Seconds before reset time to wake up
 MAX_RETRY_DELAY = int(os.getenv('MAX_RETRY_DELAY', '300'))  # Maximum retry delay in seconds
+RETRY_BASE_DELAY = float(os.getenv('RETRY_BASE_DELAY', '2'))  # First retry delay in seconds
+POLL_BACKOFF_BASE = float(os.getenv('POLL_BACKOFF_BASE', '1.3'))  # Growth factor between retries
+NOTIFY_TIMEOUT = int(os.getenv('NOTIFY_TIMEOUT', '15'))  # Max seconds to wait on notification delivery
+BATCH_WINDOW = int(os.getenv('BATCH_WINDOW', '30'))  # Resets this many seconds apart share one notification
+# Comma-separated reset types to track (e.g. 'five_hour,seven_day'); empty means every key with a resets_at
+RESET_KEYS = frozenset(k.strip() for k in os.getenv('RESET_KEYS', '').split(',') if k.strip())
+CACHE_TTL = int(os.getenv('CACHE_TTL', '30'))  # Seconds to reuse API data without re-requesting it
 
 # ==================== LOGGING SETUP ====================
 logging.basicConfig(
@@ -57,7 +95,153 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# ==================== HTTP SESSION ====================
+# One pooled session for every outgoing request so the TCP/TLS connection to
+# the API and webhook hosts is reused between calls. Rate limits and transient
+# server errors are retried a few times, with jittered backoff, on the same
+# pooled connection before the caller sees a failure.
+class _CappedRetry(Retry):
+    """
+    Retry that honours Retry-After only up to a cap. urllib3 otherwise sleeps
+    for the full value, which would hold a notification worker (and process
+    exit, which joins those workers) for as long as the server asks.
+    """
+    
+    # Spread so all retries of one delivery fit within NOTIFY_TIMEOUT
+    MAX_RETRY_AFTER = NOTIFY_TIMEOUT / 3
+    
+    def get_retry_after(self, response) -> Optional[float]:
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, self.MAX_RETRY_AFTER)
+
+
+_session = requests.Session()
+_retry = _CappedRetry(
+    total=3,
+    backoff_factor=0.5,
+    backoff_jitter=0.3,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=('POST', 'GET')
+)
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=_retry)
+_session.mount('https://', _adapter)
+_session.mount('http://', _adapter)
+
+# The API fetch runs on the monitor thread, and urllib3 sleeps for the full
+# Retry-After (uncapped, uninterruptible). Ignore that header there and keep
+# the short jittered backoff; the monitor loop's own backoff takes over after.
+if API_URL:
+    _api_retry = _retry.new(respect_retry_after_header=False)
+    _session.mount(API_URL, HTTPAdapter(pool_connections=1, pool_maxsize=2, max_retries=_api_retry))
+
+atexit.register(_session.close)
+
 # ==================== NOTIFICATION FUNCTIONS ====================
+# Deliveries are independent, so they run concurrently and a slow SMTP
+# server can't hold up the webhook
+_notify_pool = ThreadPoolExecutor(max_workers=4)
+
+_EMAIL_BODY_TEMPLATE = """\
+API Reset Notification
+======================
+
+Reset Type: {reset_type}
+Reset Time: {reset_time}
+Previous Utilization: {utilization}%
+
+The API has been reset and is ready for new requests.
+
+---
+Automated notification from Reset Monitor"""
+
+_BATCH_EMAIL_BODY_TEMPLATE = """\
+API Reset Notification
+======================
+
+{rows}
+
+The API has been reset and is ready for new requests.
+
+---
+Automated notification from Reset Monitor"""
+
+# Long-lived SMTP connection, so STARTTLS + login happen once rather than per
+# email when notifications come close together. Reset cadence is usually
+# hours and servers drop idle sessions long before that, so a connection idle
+# past _SMTP_MAX_IDLE is discarded unprobed; a newer one gets a quick NOOP.
+_smtp_client: Optional[smtplib.SMTP] = None
+_smtp_last_used = 0.0
+_smtp_lock = threading.Lock()
+_SMTP_MAX_IDLE = 120  # seconds
+_SMTP_PROBE_TIMEOUT = 5  # seconds
+
+
+def _close_smtp(graceful: bool = True):
+    """
+    Close the cached SMTP connection, if any. Caller must hold _smtp_lock.
+    
+    Args:
+        graceful: Send QUIT first; skip it for connections presumed dead
+    """
+    global _smtp_client
+    if _smtp_client is not None:
+        try:
+            if graceful:
+                _smtp_client.quit()
+            else:
+                _smtp_client.close()
+        except (smtplib.SMTPException, OSError):
+            pass
+        _smtp_client = None
+
+
+def _get_smtp() -> smtplib.SMTP:
+    """
+    Return a logged-in SMTP connection, reconnecting if the cached one is dead.
+    Caller must hold _smtp_lock.
+    """
+    global _smtp_client, _smtp_last_used
+    
+    if _smtp_client is not None:
+        if time.monotonic() - _smtp_last_used > _SMTP_MAX_IDLE:
+            logger.info("SMTP connection idle too long, reconnecting...")
+            _close_smtp(graceful=False)
+        else:
+            # Short timeout so a silently dropped connection fails fast
+            try:
+                _smtp_client.sock.settimeout(_SMTP_PROBE_TIMEOUT)
+                code, _ = _smtp_client.noop()
+                _smtp_client.sock.settimeout(_smtp_client.timeout)
+            except (smtplib.SMTPException, OSError, AttributeError):
+                code = None
+            if code != 250:
+                logger.info("SMTP connection is stale, reconnecting...")
+                _close_smtp(graceful=False)
+    
+    if _smtp_client is None:
+        server = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=30)
+        try:
+            server.starttls()
+            server.login(SMTP_USER, SMTP_PASSWORD)
+        except Exception:
+            server.close()
+            raise
+        _smtp_client = server
+    
+    _smtp_last_used = time.monotonic()
+    return _smtp_client
+
+
+def _shutdown_smtp():
+    with _smtp_lock:
+        _close_smtp()
+
+
+atexit.register(_shutdown_smtp)
+
+
 def send_email(subject: str, body: str) -> bool:
     """
     Send email notification via SMTP.
@@ -74,17 +258,20 @@ def send_email(subject: str, body: str) -> bool:
         return False
     
     try:
-        msg = MIMEMultipart()
+        msg = EmailMessage()
         msg['From'] = SMTP_USER
         msg['To'] = RECIPIENT_EMAIL
         msg['Subject'] = subject
+        msg.set_content(body)
         
-        msg.attach(MIMEText(body, 'plain'))
-        
-        with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
-            server.starttls()
-            server.login(SMTP_USER, SMTP_PASSWORD)
-            server.send_message(msg)
+        with _smtp_lock:
+            try:
+                _get_smtp().send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                # Dropped between the NOOP check and the send; retry once
+                logger.info("SMTP server disconnected, retrying on a new connection...")
+                _close_smtp(graceful=False)
+                _get_smtp().send_message(msg)
         
         logger.info(f"Email sent successfully: {subject}")
         return True
@@ -94,12 +281,27 @@ def send_email(subject: str, body: str) -> bool:
         return False
 
 
+# Fields common to every webhook payload, serialized once at import
+_PAYLOAD_PREFIX = b'{"source":"reset_monitor",'
+
+
+def _serialize_payload(payload: Dict) -> bytes:
+    """Serialize a webhook payload onto the pre-serialized _PAYLOAD_PREFIX."""
+    if 'source' in payload:
+        # The prefix already sets it; a second copy would duplicate the key
+        payload = {k: v for k, v in payload.items() if k != 'source'}
+    if not payload:
+        return _PAYLOAD_PREFIX[:-1] + b'}'
+    # Drop the opening brace so the fields continue the prefix object
+    return _PAYLOAD_PREFIX + _json_dumps(payload)[1:]
+
+
 def send_webhook(payload: Dict) -> bool:
     """
     Send notification via webhook (Discord, Slack, custom endpoint, etc.).
     
     Args:
-        payload: Dictionary to send as JSON
+        payload: Dictionary to send as JSON (a "source" field is added)
         
     Returns:
         True if webhook sent successfully, False otherwise
@@ -109,11 +311,17 @@ def send_webhook(payload: Dict) -> bool:
         return False
     
     try:
-        response = requests.post(WEBHOOK_URL, json=payload, timeout=10)
+        response = _session.post(
+            WEBHOOK_URL,
+            data=_serialize_payload(payload),
+            headers={'Content-Type': 'application/json'},
+            timeout=10
+        )
         response.raise_for_status()
         logger.info(f"Webhook sent successfully to {WEBHOOK_URL}")
         return True
-    except Exception as e:
+    except requests.RequestException as e:
+        # Transient errors were already retried by the session's adapter
         logger.error(f"Failed to send webhook: {e}")
         return False
 
@@ -143,7 +351,7 @@ def send_slack_dm(message: str) -> bool:
             "text": message
         }
         
-        response = requests.post(url, headers=headers, json=payload, timeout=10)
+        response = _session.post(url, headers=headers, json=payload, timeout=10)
         response.raise_for_status()
         
         result = response.json()
@@ -159,26 +367,43 @@ def send_slack_dm(message: str) -> bool:
         return False
 
 
-def send_reset_notification(reset_type: str, reset_time: str, utilization: float):
-    """Send notification that a reset has occurred using configured method(s)."""
+def _wait_for_notifications(futures: Dict[str, Future]):
+    """
+    Wait up to NOTIFY_TIMEOUT for deliveries to finish.
     
-    # Email notification
-    if NOTIFICATION_METHOD in ['email', 'both']:
-        subject = f"🔄 API Reset: {reset_type}"
-        body = f"""
-API Reset Notification
-======================
-
-Reset Type: {reset_type}
-Reset Time: {reset_time}
-Previous Utilization: {utilization}%
+    The send_* functions log their own failures; this only reports
+    deliveries that hung or raised unexpectedly.
+    """
+    if not futures:
+        return
+    
+    _, not_done = wait(futures.values(), timeout=NOTIFY_TIMEOUT)
+    for method, future in futures.items():
+        if future in not_done:
+            logger.error(f"{method} notification still pending after {NOTIFY_TIMEOUT}s")
+        elif future.exception() is not None:
+            logger.error(f"{method} notification raised: {future.exception()}")
 
-The API has been reset and is ready for new requests.
 
----
-Automated notification from Reset Monitor
+def dispatch_reset_notification(reset_type: str, reset_time: str, utilization: float) -> Dict[str, Future]:
     """
-        send_email(subject, body.strip())
+    Start sending a reset notification via the configured method(s) without
+    waiting for delivery.
+    
+    Returns:
+        Dictionary mapping notification method to its pending delivery
+    """
+    futures = {}
+    
+    # Email notification
+    if NOTIFICATION_METHOD in ['email', 'both']:
+        subject = f"🔄 API Reset: {reset_type}"
+        body = _EMAIL_BODY_TEMPLATE.format(
+            reset_type=reset_type,
+            reset_time=reset_time,
+            utilization=utilization
+        )
+        futures['Email'] = _notify_pool.submit(send_email, subject, body)
     
     # Webhook notification
     if NOTIFICATION_METHOD in ['webhook', 'both']:
@@ -189,7 +414,7 @@ Automated notification from Reset Monitor
             "message": f"API reset: {reset_type}",
             "timestamp": datetime.now(timezone.utc).isoformat()
         }
-        send_webhook(payload)
+        futures['Webhook'] = _notify_pool.submit(send_webhook, payload)
     
     # Slack DM notification
     if NOTIFICATION_METHOD == 'slack_dm':
@@ -199,54 +424,334 @@ Reset Time: `{reset_time}`
 Previous Utilization: {utilization}%
 
 The API has been reset and is ready for new requests."""
-        send_slack_dm(message)
+        futures['Slack DM'] = _notify_pool.submit(send_slack_dm, message)
+    
+    return futures
+
+
+def send_reset_notification(reset_type: str, reset_time: str, utilization: float):
+    """Send notification that a reset has occurred using configured method(s)."""
+    _wait_for_notifications(dispatch_reset_notification(reset_type, reset_time, utilization))
+
+
+def dispatch_reset_notification_batch(resets: List[Dict]) -> Dict[str, Future]:
+    """
+    Start sending one notification covering several resets without waiting
+    for delivery. A single reset uses the regular notification format.
+    
+    Args:
+        resets: List of dicts with 'reset_type', 'reset_time' and 'utilization'
+        
+    Returns:
+        Dictionary mapping notification method to its pending delivery
+    """
+    if len(resets) == 1:
+        return dispatch_reset_notification(**resets[0])
+    
+    futures = {}
+    reset_types = ", ".join(r['reset_type'] for r in resets)
+    
+    # Email notification
+    if NOTIFICATION_METHOD in ['email', 'both']:
+        subject = f"🔄 API Reset: {reset_types}"
+        type_width = max(len('Reset Type'), *(len(r['reset_type']) for r in resets))
+        time_width = max(len('Reset Time'), *(len(r['reset_time']) for r in resets))
+        rows = [f"{'Reset Type':<{type_width}}  {'Reset Time':<{time_width}}  Previous Utilization"]
+        rows += [
+            f"{r['reset_type']:<{type_width}}  {r['reset_time']:<{time_width}}  {r['utilization']}%"
+            for r in resets
+        ]
+        body = _BATCH_EMAIL_BODY_TEMPLATE.format(rows="\n".join(rows))
+        futures['Email'] = _notify_pool.submit(send_email, subject, body)
+    
+    # Webhook notification
+    if NOTIFICATION_METHOD in ['webhook', 'both']:
+        payload = {
+            "resets": resets,
+            "message": f"API reset: {reset_types}",
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        }
+        futures['Webhook'] = _notify_pool.submit(send_webhook, payload)
+    
+    # Slack DM notification
+    if NOTIFICATION_METHOD == 'slack_dm':
+        lines = "\n".join(
+            f"• {r['reset_type']}: `{r['reset_time']}` (previous utilization {r['utilization']}%)"
+            for r in resets
+        )
+        message = f"""🔄 *API Reset: {reset_types}*
+
+{lines}
+
+The API has been reset and is ready for new requests."""
+        futures['Slack DM'] = _notify_pool.submit(send_slack_dm, message)
+    
+    return futures
+
+
+def send_reset_notification_batch(resets: List[Dict]):
+    """Send one notification covering several resets using configured method(s)."""
+    _wait_for_notifications(dispatch_reset_notification_batch(resets))
 
 
 # ==================== API FUNCTIONS ====================
-def fetch_reset_data() -> Optional[Dict]:
+@dataclass
+class _Cache:
+    """Last API response plus the validators needed for a conditional GET."""
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    parsed: Optional[Dict] = None
+    digest: Optional[bytes] = None  # BLAKE2b of the raw body behind `parsed`
+    fetched_at: float = 0.0
+    ttl: float = CACHE_TTL
+
+
+_cache = _Cache()
+
+
+def fetch_reset_data(force: bool = False) -> Optional[Dict]:
     """
     Fetch reset time data from API endpoint.
     
+    Responses are cached for CACHE_TTL seconds, and once that expires the
+    request is sent with If-None-Match/If-Modified-Since so an unchanged
+    payload comes back as a bodyless 304.
+    
+    Args:
+        force: Skip the TTL check and always ask the server (a 304 still
+            reuses the cached data)
+    
     Returns:
         JSON response as dictionary, or None if request fails
     """
+    cached = _cache.parsed
+    if (not force and cached is not None
+            and time.monotonic() - _cache.fetched_at < _cache.ttl):
+        logger.debug("Using cached API data")
+        return cached
+    
+    headers = {}
+    if cached is not None:
+        if _cache.etag:
+            headers['If-None-Match'] = _cache.etag
+        if _cache.last_modified:
+            headers['If-Modified-Since'] = _cache.last_modified
+    
     try:
-        response = requests.get(API_URL, timeout=10)
+        response = _session.get(API_URL, headers=headers, timeout=10)
+        
+        if response.status_code == 304 and cached is not None:
+            logger.debug("API data not modified, reusing cached response")
+            _cache.fetched_at = time.monotonic()
+            return cached
+        
         response.raise_for_status()
-        return response.json()
-    except requests.RequestException as e:
+        
+        # A full 200 with a byte-identical body (e.g. the server doesn't send
+        # validators) reuses the cached object, which also keeps the
+        # parse_reset_times memo hit
+        digest = hashlib.blake2b(response.content, digest_size=8).digest()
+        if cached is not None and digest == _cache.digest:
+            logger.debug("API data unchanged, reusing cached response")
+            parsed = cached
+        else:
+            parsed = _json_loads(response.content)
+    except (requests.RequestException, ValueError) as e:
         logger.error(f"Failed to fetch data from API: {e}")
         return None
+    
+    _cache.etag = response.headers.get('ETag')
+    _cache.last_modified = response.headers.get('Last-Modified')
+    _cache.parsed = parsed
+    _cache.digest = digest
+    _cache.fetched_at = time.monotonic()
+    return parsed
+
+
+def expire_cached_data():
+    """Mark the cached API data as no longer fresh (e.g. right after a reset)."""
+    _cache.fetched_at = min(_cache.fetched_at, time.monotonic() - _cache.ttl)
+
+
+def refetch_after_delay(delay: float) -> Optional[Dict]:
+    """
+    Wait for the server to settle, then fetch from the API bypassing the TTL.
+    The wait is interruptible like the monitor's other sleeps.
+    """
+    if delay > 0:
+        _sleep(delay)
+    return fetch_reset_data(force=True)
+
+
+# fetch_reset_data hands back the same dict for unchanged API data, so parse
+# results are memoized on the identity of that dict. Each entry keeps a
+# reference to its input, so an id() can't be recycled while it's cached.
+_PARSE_CACHE_SIZE = 8
+_parse_cache: "OrderedDict[int, Tuple[Dict, Dict]]" = OrderedDict()
 
 
 def parse_reset_times(data: Dict) -> Dict[str, datetime]:
     """
     Extract all 'resets_at' timestamps from JSON response.
     
+    Results are memoized per response object, so neither argument nor
+    result may be mutated by the caller.
+    
     Args:
         data: JSON response dictionary
         
     Returns:
         Dictionary mapping reset type to datetime object
     """
+    entry = _parse_cache.get(id(data))
+    if entry is not None and entry[0] is data:
+        _parse_cache.move_to_end(id(data))
+        return entry[1]
+    
+    reset_times = _parse_reset_times(data)
+    _parse_cache[id(data)] = (data, reset_times)
+    if len(_parse_cache) > _PARSE_CACHE_SIZE:
+        _parse_cache.popitem(last=False)
+    return reset_times
+
+
+def _parse_reset_times(data: Dict) -> Dict[str, Dict]:
+    """Uncached body of parse_reset_times."""
     reset_times = {}
     
-    for key, value in data.items():
-        if isinstance(value, dict) and 'resets_at' in value:
-            try:
-                # Parse ISO 8601 timestamp with timezone
-                reset_time = datetime.fromisoformat(value['resets_at'])
-                reset_times[key] = {
-                    'time': reset_time,
-                    'utilization': value.get('utilization', 0)
-                }
-                logger.debug(f"Parsed {key}: resets at {reset_time}")
-            except (ValueError, TypeError) as e:
-                logger.warning(f"Failed to parse timestamp for {key}: {e}")
+    # Set intersection on the dict_keys view skips unrelated metadata keys
+    keys = RESET_KEYS & data.keys() if RESET_KEYS else data.keys()
+    
+    for key in keys:
+        try:
+            value = data[key]
+            resets_at = value['resets_at']
+        except (KeyError, TypeError):
+            # Not a reset entry (missing field or not an object)
+            continue
+        
+        try:
+            # Parse ISO 8601 timestamp with timezone
+            reset_time = parse_datetime(resets_at)
+            reset_times[key] = {
+                'time': reset_time,
+                'timestamp': reset_time.timestamp(),  # POSIX seconds, for cheap comparisons
+                'utilization': value.get('utilization', 0)
+            }
+            logger.debug(f"Parsed {key}: resets at {reset_time}")
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Failed to parse timestamp for {key}: {e}")
     
     return reset_times
 
 
+# ==================== SLEEP CONTROL ====================
+# The monitor sleeps in select() on a self-pipe rather than time.sleep(), so
+# signal handlers (or anything else in-process) can wake it immediately.
+# Waking only sets plain flags and writes a byte to a socket, neither of which
+# takes a lock, so it's safe from a signal handler that interrupts the main
+# thread anywhere (threading.Event.set() is not: it takes the Event's lock).
+_wake_recv, _wake_send = socket.socketpair()
+_wake_recv.setblocking(False)
+_wake_send.setblocking(False)
+_stop_requested = False
+# Set by request_recheck() so the woken loop bypasses the fetch cache
+_recheck_requested = False
+
+
+def _wake():
+    try:
+        _wake_send.send(b'\0')
+    except BlockingIOError:
+        pass  # buffer full, a wake-up is already pending
+
+
+def request_recheck():
+    """Wake the monitor loop so it re-fetches reset times from the API right away."""
+    global _recheck_requested
+    _recheck_requested = True
+    _wake()
+
+
+def request_stop():
+    """Wake the monitor loop and make it exit."""
+    global _stop_requested
+    _stop_requested = True
+    _wake()
+
+
+def install_signal_handlers():
+    """SIGTERM stops the monitor, SIGHUP forces a re-check. Main thread only."""
+    signal.signal(signal.SIGTERM, lambda *_: request_stop())
+    if hasattr(signal, 'SIGHUP'):
+        signal.signal(signal.SIGHUP, lambda *_: request_recheck())
+
+
+# glibc keeps freed heap pages mapped; malloc_trim() hands them back to the OS
+_malloc_trim = None
+if sys.platform.startswith('linux'):
+    try:
+        try:
+            _libc = ctypes.CDLL('libc.so.6')
+        except OSError:
+            _libc = ctypes.CDLL(None)  # symbols already loaded into the process
+        _malloc_trim = _libc.malloc_trim
+    except (OSError, AttributeError):
+        pass  # not glibc (e.g. musl)
+
+# Sleeps at least this long release memory first
+_LONG_SLEEP = 60
+
+
+def _release_memory():
+    """Collect garbage and return freed heap memory to the OS before idling."""
+    gc.collect()
+    if _malloc_trim is not None:
+        _malloc_trim(0)
+
+
+def _sleep(seconds: float) -> bool:
+    """
+    Sleep for up to the given number of seconds.
+    
+    Returns:
+        True if woken early by request_recheck()/request_stop(), False on timeout
+    """
+    readable, _, _ = select.select([_wake_recv], [], [], seconds)
+    if not readable:
+        return False
+    
+    # Drain every pending wake-up so the next sleep isn't cut short
+    try:
+        while _wake_recv.recv(4096):
+            pass
+    except BlockingIOError:
+        pass
+    return True
+
+
+def _sleep_before_reset(seconds: float) -> Optional[float]:
+    """
+    Sleep ahead of a reset.
+    
+    Elapsed time is measured on the monotonic clock so an NTP step during a
+    long sleep can't make it look like we missed the reset.
+    
+    Returns:
+        Current time in POSIX seconds, or None if woken early
+    """
+    wall_start = time.time()
+    mono_start = time.monotonic()
+    
+    if seconds > 0:
+        if seconds >= _LONG_SLEEP:
+            _release_memory()
+        if _sleep(seconds):
+            return None
+    
+    return wall_start + (time.monotonic() - mono_start)
+
+
 # ==================== MONITORING LOGIC ====================
 def monitor_resets():
     """
@@ -257,19 +762,26 @@ def monitor_resets():
     logger.info(f"API URL: {API_URL}")
     logger.info(f"Sleep buffer: {SLEEP_BUFFER}s before reset time")
     
+    global _recheck_requested
     retry_count = 0
     
-    while True:
+    while not _stop_requested:
         try:
             # Fetch current data
             logger.info("Fetching reset time data from API...")
-            data = fetch_reset_data()
+            force, _recheck_requested = _recheck_requested, False
+            data = fetch_reset_data(force=force)
             
             if data is None:
                 retry_count += 1
-                retry_delay = min(30 * retry_count, MAX_RETRY_DELAY)
-                logger.warning(f"API fetch failed. Retrying in {retry_delay}s (attempt {retry_count})")
-                time.sleep(retry_delay)
+                # Gentle geometric backoff with jitter; the exponent is capped
+                # so a very long outage can't overflow the float
+                retry_delay = min(
+                    RETRY_BASE_DELAY * (POLL_BACKOFF_BASE ** min(retry_count, 100)) + random.uniform(0, 1),
+                    MAX_RETRY_DELAY
+                )
+                logger.warning(f"API fetch failed. Retrying in {retry_delay:.1f}s (attempt {retry_count})")
+                _sleep(retry_delay)
                 continue
             
             # Reset retry counter on successful fetch
@@ -280,69 +792,77 @@ def monitor_resets():
             
             if not reset_times:
                 logger.warning("No reset times found in API response. Retrying in 60s...")
-                time.sleep(60)
+                _sleep(60)
                 continue
             
-            # Get current time
-            now = datetime.now(timezone.utc)
+            # Get current time (POSIX seconds; datetimes are only built for logging)
+            now_ts = time.time()
             
-            # Find the next upcoming reset
-            upcoming_resets = []
+            # Log how far away each reset is
             for reset_type, reset_info in reset_times.items():
-                reset_time = reset_info['time']
-                time_until = (reset_time - now).total_seconds()
+                time_until = reset_info['timestamp'] - now_ts
                 
                 if time_until > 0:
-                    upcoming_resets.append({
-                        'type': reset_type,
-                        'time': reset_time,
-                        'utilization': reset_info['utilization'],
-                        'seconds_until': time_until
-                    })
-                    logger.info(f"{reset_type}: {time_until / 3600:.2f} hours until reset ({reset_time.isoformat()})")
+                    logger.info(f"{reset_type}: {time_until / 3600:.2f} hours until reset ({reset_info['time'].isoformat()})")
                 else:
-                    logger.info(f"{reset_type}: reset time already passed ({reset_time.isoformat()})")
+                    logger.info(f"{reset_type}: reset time already passed ({reset_info['time'].isoformat()})")
+            
+            # Find the next upcoming reset in a single pass
+            upcoming = ((rt, info) for rt, info in reset_times.items() if info['timestamp'] > now_ts)
+            next_type, next_info = min(upcoming, key=lambda kv: kv[1]['timestamp'], default=(None, None))
             
-            if not upcoming_resets:
+            if next_type is None:
                 logger.warning("All reset times are in the past! Fetching fresh data in 30s...")
-                time.sleep(30)
+                _sleep(30)
                 continue
             
-            # Sort by time and get the earliest reset
-            upcoming_resets.sort(key=lambda x: x['seconds_until'])
-            next_reset = upcoming_resets[0]
+            # Resets due within BATCH_WINDOW of the next one are handled
+            # together: sleep until the last of them, then notify once
+            window_end = next_info['timestamp'] + BATCH_WINDOW
+            batch = [
+                (rt, info) for rt, info in reset_times.items()
+                if now_ts < info['timestamp'] <= window_end
+            ]
+            batch_types = ", ".join(rt for rt, _ in batch)
+            target_info = max((info for _, info in batch), key=lambda info: info['timestamp'])
+            
+            seconds_until = target_info['timestamp'] - now_ts
             
             # Calculate sleep time (wake up a few seconds before the reset)
-            sleep_duration = max(0, next_reset['seconds_until'] - SLEEP_BUFFER)
+            sleep_duration = max(0, seconds_until - SLEEP_BUFFER)
             
             if sleep_duration > 0:
-                wake_time = now + (next_reset['time'] - now) - (SLEEP_BUFFER * 1)
-                logger.info(f"⏰ Sleeping for {sleep_duration / 3600:.2f} hours until {next_reset['type']} reset")
+                wake_time = target_info['time'] - timedelta(seconds=SLEEP_BUFFER)
+                logger.info(f"⏰ Sleeping for {sleep_duration / 3600:.2f} hours until {batch_types} reset")
                 logger.info(f"   Will wake at {wake_time.isoformat()} ({SLEEP_BUFFER}s before reset)")
-                time.sleep(sleep_duration)
             
-            # Re-check current time after sleeping
-            now = datetime.now(timezone.utc)
+            # Sleep, then re-check current time
+            now_ts = _sleep_before_reset(sleep_duration)
+            if now_ts is None:
+                logger.info("Woken early, re-checking reset times...")
+                continue
             
             # Check if we've reached or passed the reset time
-            time_until_reset = (next_reset['time'] - now).total_seconds()
+            time_until_reset = target_info['timestamp'] - now_ts
             
             if time_until_reset <= SLEEP_BUFFER and time_until_reset >= -60:
                 # We're at the reset time (within buffer window)
-                logger.info(f"🔄 Reset time reached for {next_reset['type']}!")
-                send_reset_notification(
-                    next_reset['type'],
-                    next_reset['time'].isoformat(),
-                    next_reset['utilization']
-                )
-                
-                # Wait a moment for the reset to complete
-                logger.info("Waiting 5 seconds for reset to complete...")
-                time.sleep(5)
+                logger.info(f"🔄 Reset time reached for {batch_types}!")
+                # Deliveries run in the background while fresh data is fetched
+                pending_notifications = dispatch_reset_notification_batch([
+                    {
+                        'reset_type': reset_type,
+                        'reset_time': reset_info['time'].isoformat(),
+                        'utilization': reset_info['utilization']
+                    }
+                    for reset_type, reset_info in batch
+                ])
                 
-                # Fetch fresh data immediately after reset
-                logger.info("Fetching fresh data after reset...")
-                fresh_data = fetch_reset_data()
+                # Anything fetched before the reset is outdated now; wait for
+                # the reset to complete and fetch fresh data
+                expire_cached_data()
+                logger.info("Fetching fresh data after reset (waiting 5 seconds for reset to complete)...")
+                fresh_data = refetch_after_delay(5)
                 if fresh_data:
                     logger.info("Fresh data retrieved successfully!")
                     new_resets = parse_reset_times(fresh_data)
@@ -351,16 +871,18 @@ def monitor_resets():
                 else:
                     logger.warning("Failed to fetch fresh data after reset")
                 
+                _wait_for_notifications(pending_notifications)
+                
                 # Continue to next iteration to recalculate next reset
                 continue
             elif time_until_reset < -60:
                 # We somehow missed the reset window (clock drift or long sleep?)
-                logger.warning(f"Missed reset window for {next_reset['type']} by {abs(time_until_reset)}s")
+                logger.warning(f"Missed reset window for {batch_types} by {abs(time_until_reset)}s")
                 continue
             else:
                 # Still waiting for reset, sleep a bit more
                 logger.info(f"Still {time_until_reset:.1f}s until reset, sleeping...")
-                time.sleep(max(1, time_until_reset))
+                _sleep(max(1, time_until_reset))
                 continue
             
         except KeyboardInterrupt:
@@ -369,7 +891,12 @@ def monitor_resets():
         except Exception as e:
             logger.error(f"Unexpected error in monitoring loop: {e}", exc_info=True)
             logger.info("Retrying in 60 seconds...")
-            time.sleep(60)
+            _sleep(60)
+    
+    if _stop_requested:
+        logger.info("Monitor stopped by signal")
+        # Don't let queued or retrying deliveries hold up exit
+        _notify_pool.shutdown(wait=False, cancel_futures=True)
 
 
 # ==================== MAIN ENTRY POINT ====================
@@ -408,6 +935,8 @@ if __name__ == "__main__":
     if NOTIFICATION_METHOD == 'slack_dm':
         logger.info(f"  Slack DM: {SLACK_USER_ID}")
     
+    install_signal_handlers()
+    
     try:
         monitor_resets()
     except Exception as e:
@@ -5,17 +5,44 @@ A simple Flask server that receives and logs reset notifications.
 This is useful if you want to run your own webhook endpoint.
 
 Usage:
-    pip install flask
-    python webhook_receiver.py
+    pip install flask gunicorn
+    pip install orjson  # optional, faster JSON parsing/serialization
+    python webhook_receiver.py        # gunicorn, multiple workers
+    python webhook_receiver.py --dev  # Flask development server
 
 Then set WEBHOOK_URL=http://your-server:5000/webhook in your .env file
 """
 
 from flask import Flask, request, jsonify
+from flask.json.provider import DefaultJSONProvider
 from datetime import datetime
 import logging
+import os
+import sys
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # orjson not installed, Flask's stdlib json is used
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, used by get_json() and jsonify()."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj), mimetype="application/json")
+
 
 app = Flask(__name__)
+if orjson is not None:
+    app.json = OrjsonProvider(app)
 
 # Setup logging
 logging.basicConfig(
@@ -37,9 +64,17 @@ def webhook():
         
         logger.info("=" * 60)
         logger.info("RESET NOTIFICATION RECEIVED")
-        logger.info(f"Reset Type: {data.get('reset_type')}")
-        logger.info(f"Reset Time: {data.get('reset_time')}")
-        logger.info(f"Utilization: {data.get('utilization')}%")
+        # Batched notifications carry a list of resets instead of one
+        resets = data.get('resets')
+        if resets is not None:
+            for reset in resets:
+                logger.info(f"Reset Type: {reset.get('reset_type')}")
+                logger.info(f"Reset Time: {reset.get('reset_time')}")
+                logger.info(f"Utilization: {reset.get('utilization')}%")
+        else:
+            logger.info(f"Reset Type: {data.get('reset_type')}")
+            logger.info(f"Reset Time: {data.get('reset_time')}")
+            logger.info(f"Utilization: {data.get('utilization')}%")
         logger.info(f"Message: {data.get('message')}")
         logger.info(f"Timestamp: {data.get('timestamp')}")
         logger.info("=" * 60)
@@ -64,8 +99,46 @@ def health():
     return jsonify({"status": "ok", "timestamp": datetime.utcnow().isoformat()}), 200
 
 
+def run_gunicorn(host: str, port: int):
+    """Serve the app with gunicorn so concurrent deliveries don't queue up."""
+    from gunicorn.app.base import BaseApplication
+
+    class ReceiverApplication(BaseApplication):
+        def __init__(self, application, options):
+            self.application = application
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return self.application
+
+    options = {
+        'bind': f'{host}:{port}',
+        'workers': max(2, os.cpu_count() or 1),
+        'threads': 4,
+        'worker_class': 'gthread',
+        'keepalive': 30,
+    }
+    ReceiverApplication(app, options).run()
+
+
 if __name__ == '__main__':
+    dev_mode = '--dev' in sys.argv[1:]
+    if not dev_mode:
+        try:
+            import gunicorn  # noqa: F401
+        except ImportError:
+            logger.warning("gunicorn not installed, falling back to the Flask dev server (pip install gunicorn)")
+            dev_mode = True
+
     logger.info("Starting webhook receiver on http://0.0.0.0:5000")
     logger.info("Webhook endpoint: http://0.0.0.0:5000/webhook")
     logger.info("Health check: http://0.0.0.0:5000/health")
-    app.run(host='0.0.0.0', port=5000, debug=False)
+    if dev_mode:
+        app.run(host='0.0.0.0', port=5000, debug=False)
+    else:
+        run_gunicorn('0.0.0.0', 5000)